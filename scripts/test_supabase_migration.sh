@@ -51,7 +51,7 @@ for rpc_name in add_song_member_by_email submit_take_and_enqueue_render; do
 done
 
 echo "Checking integrity triggers..."
-for trigger_name in takes_assert_song_slot_consistency track_slots_assert_current_take_consistency; do
+for trigger_name in takes_assert_song_slot_consistency track_slots_assert_current_take_consistency takes_guard_probe_metadata; do
   trigger_exists="$(query "select exists(select 1 from pg_trigger where tgname='${trigger_name}' and not tgisinternal);")"
   if [[ "${trigger_exists}" != "t" ]]; then
     echo "Missing trigger: ${trigger_name}"
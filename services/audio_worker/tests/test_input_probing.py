@@ -0,0 +1,398 @@
+import json
+import subprocess
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+if "psycopg" not in sys.modules:
+    fake_psycopg = types.ModuleType("psycopg")
+
+    class _FakePsycopgError(Exception):
+        pass
+
+    def _connect(*args, **kwargs):  # noqa: ANN001, ANN002
+        raise RuntimeError("psycopg.connect should be mocked in tests")
+
+    fake_psycopg.Error = _FakePsycopgError
+    fake_psycopg.connect = _connect
+    sys.modules["psycopg"] = fake_psycopg
+
+if "psycopg.rows" not in sys.modules:
+    fake_rows = types.ModuleType("psycopg.rows")
+    fake_rows.dict_row = object()
+    sys.modules["psycopg.rows"] = fake_rows
+
+if "supabase" not in sys.modules:
+    fake_supabase = types.ModuleType("supabase")
+
+    class _FakeSupabaseClient:
+        pass
+
+    def _create_client(*args, **kwargs):  # noqa: ANN001, ANN002
+        return _FakeSupabaseClient()
+
+    fake_supabase.Client = _FakeSupabaseClient
+    fake_supabase.create_client = _create_client
+    sys.modules["supabase"] = fake_supabase
+
+import worker
+
+
+def _ffprobe_result(stdout="", returncode=0):
+    return subprocess.CompletedProcess(
+        args=["ffprobe"], returncode=returncode, stdout=stdout, stderr=""
+    )
+
+
+def _ffprobe_report(sample_rate="48000", channels=2, duration="1.5", codec="pcm_s16le"):
+    return json.dumps(
+        {
+            "streams": [
+                {
+                    "codec_name": codec,
+                    "sample_rate": sample_rate,
+                    "channels": channels,
+                }
+            ],
+            "format": {"duration": duration},
+        }
+    )
+
+
+class _FakeCursor:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, query, params=None):
+        self.calls.append((query, params))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _FakeDb:
+    def __init__(self):
+        self.cursor_obj = _FakeCursor()
+        self.commits = 0
+
+    def cursor(self):
+        return self.cursor_obj
+
+    def commit(self):
+        self.commits += 1
+
+
+class InputProbingTest(unittest.TestCase):
+    def _make_worker(self, db):
+        instance = worker.AudioWorker.__new__(worker.AudioWorker)
+        instance._db = db
+        return instance
+
+    def test_probe_audio_parses_ffprobe_report(self):
+        with patch(
+            "worker.subprocess.run", return_value=_ffprobe_result(_ffprobe_report())
+        ):
+            probe = worker.AudioWorker._probe_audio(Path("take.wav"))
+
+        self.assertEqual(
+            probe,
+            worker.AudioProbe(
+                sample_rate=48000, channels=2, duration_ms=1500, codec_name="pcm_s16le"
+            ),
+        )
+        self.assertTrue(probe.matches_mix_format)
+
+    def test_probe_audio_accepts_short_take(self):
+        with patch(
+            "worker.subprocess.run",
+            return_value=_ffprobe_result(_ffprobe_report(duration="0.0004")),
+        ):
+            probe = worker.AudioWorker._probe_audio(Path("click.wav"))
+
+        self.assertEqual(probe.duration_ms, 0)
+
+    def test_probe_audio_allows_unknown_duration(self):
+        with patch(
+            "worker.subprocess.run",
+            return_value=_ffprobe_result(_ffprobe_report(duration="N/A")),
+        ):
+            probe = worker.AudioWorker._probe_audio(Path("stream.webm"))
+
+        self.assertIsNone(probe.duration_ms)
+        self.assertTrue(probe.matches_mix_layout)
+
+    def test_probe_audio_rejects_unreadable_file(self):
+        with patch(
+            "worker.subprocess.run", return_value=_ffprobe_result(returncode=1)
+        ):
+            with self.assertRaises(RuntimeError):
+                worker.AudioWorker._probe_audio(Path("corrupt.wav"))
+
+    def test_probe_audio_rejects_file_without_audio_stream(self):
+        report = json.dumps({"streams": [], "format": {"duration": "1.0"}})
+        with patch("worker.subprocess.run", return_value=_ffprobe_result(report)):
+            with self.assertRaises(RuntimeError):
+                worker.AudioWorker._probe_audio(Path("video_only.mp4"))
+
+    def test_probe_take_uses_cached_row_values(self):
+        fake_db = _FakeDb()
+        test_worker = self._make_worker(fake_db)
+        take = {
+            "id": "take-1",
+            "file_path": "song/take.wav",
+            "sample_rate": 44100,
+            "channels": 1,
+            "duration_ms": 2000,
+            "probed_at": "2026-10-19T00:00:00+00:00",
+        }
+
+        with patch("worker.subprocess.run") as run_mock:
+            probe = test_worker._probe_take(take, Path("input_0.wav"))
+
+        run_mock.assert_not_called()
+        self.assertEqual(fake_db.commits, 0)
+        self.assertFalse(probe.matches_mix_layout)
+
+    def test_probe_take_persists_probe_results(self):
+        fake_db = _FakeDb()
+        test_worker = self._make_worker(fake_db)
+        take = {
+            "id": "take-1",
+            "file_path": "song/take.m4a",
+            "sample_rate": None,
+            "channels": None,
+            "duration_ms": None,
+            "probed_at": None,
+        }
+
+        with patch(
+            "worker.subprocess.run",
+            return_value=_ffprobe_result(_ffprobe_report(sample_rate="44100", codec="aac")),
+        ):
+            probe = test_worker._probe_take(take, Path("input_0.m4a"))
+
+        self.assertEqual(probe.sample_rate, 44100)
+        self.assertEqual(fake_db.commits, 1)
+        query, params = fake_db.cursor_obj.calls[0]
+        self.assertIn("update public.takes", query)
+        self.assertIn("probed_at", query)
+        self.assertEqual(params, (44100, 2, 1500, "take-1"))
+
+    def test_probe_take_ignores_client_values_without_probe_marker(self):
+        fake_db = _FakeDb()
+        test_worker = self._make_worker(fake_db)
+        take = {
+            "id": "take-1",
+            "file_path": "song/take.wav",
+            "sample_rate": 48000,
+            "channels": 2,
+            "duration_ms": 2000,
+            "probed_at": None,
+        }
+
+        with patch(
+            "worker.subprocess.run",
+            return_value=_ffprobe_result(_ffprobe_report(sample_rate="44100", channels=1)),
+        ) as run_mock:
+            probe = test_worker._probe_take(take, Path("input_0.wav"))
+
+        run_mock.assert_called_once()
+        self.assertEqual((probe.sample_rate, probe.channels), (44100, 1))
+
+    def test_build_mix_command_skips_resampling_for_conforming_inputs(self):
+        command = worker.AudioWorker._build_mix_command(
+            [Path("a.wav"), Path("b.wav")], Path("mix.wav"), resample=False
+        )
+
+        self.assertNotIn("-ar", command)
+        self.assertNotIn("-ac", command)
+        self.assertIn("amix=inputs=2:normalize=0,alimiter=limit=0.95", command)
+
+    def test_build_mix_command_resamples_nonconforming_inputs(self):
+        command = worker.AudioWorker._build_mix_command(
+            [Path("a.m4a")], Path("mix.wav"), resample=True
+        )
+
+        self.assertEqual(command[command.index("-ar") + 1], "48000")
+        self.assertEqual(command[command.index("-ac") + 1], "2")
+
+
+class _FakeBucket:
+    def download(self, path):
+        return b"audio"
+
+
+class _FakeStorage:
+    def from_(self, bucket):
+        return _FakeBucket()
+
+
+class _FakeSupabase:
+    storage = _FakeStorage()
+
+
+def _take(index):
+    return {
+        "id": f"take-{index}",
+        "file_path": f"song/take_{index}.wav",
+        "sample_rate": None,
+        "channels": None,
+        "duration_ms": None,
+        "probed_at": None,
+        "slot_index": index,
+    }
+
+
+class RenderFastPathTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory(prefix="audio-worker-test-")
+        self.work_directory = Path(self._temp_dir.name)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _make_worker(self):
+        instance = worker.AudioWorker.__new__(worker.AudioWorker)
+        instance._db = _FakeDb()
+        instance._supabase = _FakeSupabase()
+        return instance
+
+    def _render_mix(self, probes):
+        test_worker = self._make_worker()
+        takes = [_take(index) for index in range(len(probes))]
+        with patch.object(
+            test_worker, "_fetch_selected_takes", return_value=takes
+        ), patch.object(
+            worker.AudioWorker, "_probe_audio", side_effect=probes
+        ), patch.object(worker.AudioWorker, "_run_ffmpeg") as run_mock:
+            output = test_worker._render_mix("song-1", self.work_directory, "job-1")
+        return output, run_mock
+
+    def _render_wav_export(self, probe):
+        test_worker = self._make_worker()
+        with patch.object(
+            test_worker, "_fetch_current_mix_path", return_value="song-1/mix.wav"
+        ), patch.object(
+            worker.AudioWorker, "_probe_audio", return_value=probe
+        ), patch.object(worker.AudioWorker, "_run_ffmpeg") as run_mock:
+            output = test_worker._render_export(
+                "song-1", "wav", self.work_directory, "job-1"
+            )
+        return output, run_mock
+
+    def test_render_mix_skips_resampling_for_conforming_takes(self):
+        probes = [
+            worker.AudioProbe(sample_rate=48000, channels=2, duration_ms=1000),
+            worker.AudioProbe(sample_rate=48000, channels=2, duration_ms=1000),
+        ]
+
+        output, run_mock = self._render_mix(probes)
+
+        run_mock.assert_called_once_with(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                str(self.work_directory / "input_0.wav"),
+                "-i",
+                str(self.work_directory / "input_1.wav"),
+                "-filter_complex",
+                "amix=inputs=2:normalize=0,alimiter=limit=0.95",
+                str(output),
+            ]
+        )
+
+    def test_render_mix_resamples_when_any_take_differs(self):
+        probes = [
+            worker.AudioProbe(sample_rate=48000, channels=2, duration_ms=1000),
+            worker.AudioProbe(sample_rate=44100, channels=1, duration_ms=1000),
+        ]
+
+        output, run_mock = self._render_mix(probes)
+
+        run_mock.assert_called_once_with(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                str(self.work_directory / "input_0.wav"),
+                "-i",
+                str(self.work_directory / "input_1.wav"),
+                "-filter_complex",
+                "amix=inputs=2:normalize=0,alimiter=limit=0.95",
+                "-ar",
+                "48000",
+                "-ac",
+                "2",
+                str(output),
+            ]
+        )
+
+    def test_render_mix_rejects_corrupt_take_before_mixing(self):
+        test_worker = self._make_worker()
+        probes = [
+            worker.AudioProbe(sample_rate=48000, channels=2, duration_ms=1000),
+            RuntimeError("ffprobe could not read file"),
+        ]
+        with patch.object(
+            test_worker, "_fetch_selected_takes", return_value=[_take(0), _take(1)]
+        ), patch.object(
+            worker.AudioWorker, "_probe_audio", side_effect=probes
+        ), patch.object(worker.AudioWorker, "_run_ffmpeg") as run_mock:
+            with self.assertRaises(RuntimeError) as context:
+                test_worker._render_mix("song-1", self.work_directory, "job-1")
+
+        self.assertIn("song/take_1.wav", str(context.exception))
+        run_mock.assert_not_called()
+
+    def test_render_export_stream_copies_conforming_wav(self):
+        probe = worker.AudioProbe(
+            sample_rate=48000, channels=2, duration_ms=1000, codec_name="pcm_s16le"
+        )
+
+        output, run_mock = self._render_wav_export(probe)
+
+        run_mock.assert_called_once_with(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                str(self.work_directory / "current_mix.wav"),
+                "-c:a",
+                "copy",
+                str(output),
+            ]
+        )
+
+    def test_render_export_transcodes_nonconforming_wav(self):
+        probe = worker.AudioProbe(
+            sample_rate=48000, channels=2, duration_ms=1000, codec_name="pcm_f32le"
+        )
+
+        output, run_mock = self._render_wav_export(probe)
+
+        run_mock.assert_called_once_with(
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                str(self.work_directory / "current_mix.wav"),
+                "-ar",
+                "48000",
+                "-ac",
+                "2",
+                "-c:a",
+                "pcm_s16le",
+                str(output),
+            ]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
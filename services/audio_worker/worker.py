@@ -1,4 +1,5 @@
 import dataclasses
+import json
 import logging
 import os
 import socket
@@ -19,6 +20,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger("audio-worker")
 
+MIX_SAMPLE_RATE = 48000
+MIX_CHANNELS = 2
+MIX_CODEC = "pcm_s16le"
+
+
+@dataclasses.dataclass(frozen=True)
+class AudioProbe:
+    sample_rate: int
+    channels: int
+    duration_ms: int | None
+    codec_name: str | None = None
+
+    @property
+    def matches_mix_layout(self) -> bool:
+        return self.sample_rate == MIX_SAMPLE_RATE and self.channels == MIX_CHANNELS
+
+    @property
+    def matches_mix_format(self) -> bool:
+        return self.matches_mix_layout and self.codec_name == MIX_CODEC
+
 
 @dataclasses.dataclass(frozen=True)
 class Settings:
@@ -237,6 +258,7 @@ class AudioWorker:
             raise RuntimeError("Cannot render mix: no selected takes found.")
 
         input_files: list[Path] = []
+        probes: list[AudioProbe] = []
         for index, take in enumerate(takes):
             take_file_path = take["file_path"]
             payload = self._supabase.storage.from_("takes").download(take_file_path)
@@ -244,41 +266,63 @@ class AudioWorker:
             local_input = work_directory / f"input_{index}{extension}"
             local_input.write_bytes(payload)
             input_files.append(local_input)
+            probes.append(self._probe_take(take, local_input))
 
         output_file = work_directory / f"mix_{job_id}.wav"
+        resample = not all(probe.matches_mix_layout for probe in probes)
+        self._run_ffmpeg(
+            self._build_mix_command(input_files, output_file, resample=resample)
+        )
+        return output_file
+
+    def _probe_take(self, take: dict[str, Any], local_input: Path) -> AudioProbe:
+        if take["probed_at"] is not None:
+            return AudioProbe(
+                sample_rate=take["sample_rate"],
+                channels=take["channels"],
+                duration_ms=take["duration_ms"],
+            )
+
+        try:
+            probe = self._probe_audio(local_input)
+        except RuntimeError as error:
+            raise RuntimeError(
+                f"Cannot render mix: take {take['file_path']} is not valid audio ({error})."
+            ) from error
+        self._persist_take_probe(take["id"], probe)
+        return probe
+
+    @staticmethod
+    def _build_mix_command(
+        input_files: list[Path], output_file: Path, resample: bool
+    ) -> list[str]:
         ffmpeg_inputs: list[str] = []
         for input_file in input_files:
             ffmpeg_inputs.extend(["-i", str(input_file)])
 
+        format_args: list[str] = []
+        if resample:
+            format_args = ["-ar", str(MIX_SAMPLE_RATE), "-ac", str(MIX_CHANNELS)]
+
         if len(input_files) == 1:
-            ffmpeg_command = [
+            return [
                 "ffmpeg",
                 "-y",
                 *ffmpeg_inputs,
-                "-ar",
-                "48000",
-                "-ac",
-                "2",
+                *format_args,
                 "-af",
                 "alimiter=limit=0.95",
                 str(output_file),
             ]
-        else:
-            ffmpeg_command = [
-                "ffmpeg",
-                "-y",
-                *ffmpeg_inputs,
-                "-filter_complex",
-                f"amix=inputs={len(input_files)}:normalize=0,alimiter=limit=0.95",
-                "-ar",
-                "48000",
-                "-ac",
-                "2",
-                str(output_file),
-            ]
-
-        self._run_ffmpeg(ffmpeg_command)
-        return output_file
+        return [
+            "ffmpeg",
+            "-y",
+            *ffmpeg_inputs,
+            "-filter_complex",
+            f"amix=inputs={len(input_files)}:normalize=0,alimiter=limit=0.95",
+            *format_args,
+            str(output_file),
+        ]
 
     def _render_export(
         self,
@@ -310,17 +354,23 @@ class AudioWorker:
             ]
         elif output_format == "wav":
             output_file = work_directory / f"export_{job_id}.wav"
+            if self._probe_audio(input_file).matches_mix_format:
+                codec_args = ["-c:a", "copy"]
+            else:
+                codec_args = [
+                    "-ar",
+                    str(MIX_SAMPLE_RATE),
+                    "-ac",
+                    str(MIX_CHANNELS),
+                    "-c:a",
+                    MIX_CODEC,
+                ]
             ffmpeg_command = [
                 "ffmpeg",
                 "-y",
                 "-i",
                 str(input_file),
-                "-ar",
-                "48000",
-                "-ac",
-                "2",
-                "-c:a",
-                "pcm_s16le",
+                *codec_args,
                 str(output_file),
             ]
         else:
@@ -359,7 +409,14 @@ class AudioWorker:
         with self._db.cursor() as cursor:
             cursor.execute(
                 """
-                select t.file_path, ts.slot_index
+                select
+                  t.id,
+                  t.file_path,
+                  t.sample_rate,
+                  t.channels,
+                  t.duration_ms,
+                  t.probed_at,
+                  ts.slot_index
                 from public.track_slots ts
                 join public.takes t on t.id = ts.current_take_id
                 where ts.song_id = %s
@@ -369,6 +426,21 @@ class AudioWorker:
             )
             return cursor.fetchall()
 
+    def _persist_take_probe(self, take_id: str, probe: AudioProbe) -> None:
+        with self._db.cursor() as cursor:
+            cursor.execute(
+                """
+                update public.takes
+                set sample_rate = %s,
+                    channels = %s,
+                    duration_ms = %s,
+                    probed_at = timezone('utc', now())
+                where id = %s
+                """,
+                (probe.sample_rate, probe.channels, probe.duration_ms, take_id),
+            )
+        self._db.commit()
+
     def _fetch_current_mix_path(self, song_id: str) -> str | None:
         with self._db.cursor() as cursor:
             cursor.execute(
@@ -460,6 +532,57 @@ class AudioWorker:
             logger.error("ffmpeg stderr: %s", completed.stderr)
             raise RuntimeError("ffmpeg command failed")
 
+    @staticmethod
+    def _probe_audio(path: Path) -> AudioProbe:
+        command = [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=codec_name,sample_rate,channels:format=duration",
+            "-of",
+            "json",
+            str(path),
+        ]
+        logger.debug("Running ffprobe command: %s", " ".join(command))
+        completed = subprocess.run(
+            command,
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            logger.error("ffprobe stderr: %s", completed.stderr)
+            raise RuntimeError("ffprobe could not read file")
+
+        try:
+            report = json.loads(completed.stdout or "{}")
+            streams = report.get("streams") or []
+            if not streams:
+                raise RuntimeError("no audio stream found")
+            stream = streams[0]
+            sample_rate = int(stream["sample_rate"])
+            channels = int(stream["channels"])
+        except (KeyError, TypeError, ValueError) as error:
+            raise RuntimeError("ffprobe returned incomplete stream info") from error
+
+        if sample_rate <= 0 or channels <= 0:
+            raise RuntimeError("audio stream reports no sample rate or channels")
+
+        try:
+            duration_ms = round(float(report["format"]["duration"]) * 1000)
+        except (KeyError, TypeError, ValueError):
+            duration_ms = None
+
+        return AudioProbe(
+            sample_rate=sample_rate,
+            channels=channels,
+            duration_ms=duration_ms,
+            codec_name=stream.get("codec_name"),
+        )
+
 
 def main() -> None:
     settings = Settings.from_env()
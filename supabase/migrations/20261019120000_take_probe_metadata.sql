@@ -0,0 +1,41 @@
+begin;
+
+alter table public.takes
+  add column if not exists probed_at timestamptz;
+
+-- Probe metadata is owned by the audio worker. Client writes (direct or via
+-- submit_take_and_enqueue_render) cannot set it, and replacing a take's file
+-- clears it so the worker probes the new upload.
+create or replace function public.guard_take_probe_metadata()
+returns trigger
+language plpgsql
+set search_path = public
+as $$
+begin
+  if auth.uid() is null then
+    return new;
+  end if;
+
+  if tg_op = 'INSERT' or new.file_path is distinct from old.file_path then
+    new.sample_rate := null;
+    new.channels := null;
+    new.duration_ms := null;
+    new.probed_at := null;
+  else
+    new.sample_rate := old.sample_rate;
+    new.channels := old.channels;
+    new.duration_ms := old.duration_ms;
+    new.probed_at := old.probed_at;
+  end if;
+
+  return new;
+end;
+$$;
+
+drop trigger if exists takes_guard_probe_metadata on public.takes;
+create trigger takes_guard_probe_metadata
+before insert or update on public.takes
+for each row
+execute function public.guard_take_probe_metadata();
+
+commit;